@@ -6,16 +6,14 @@ Interactive Streamlit dashboard for F1 performance analysis
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 from pathlib import Path
 import sys
 
 # Add src to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.data_cleaner import F1DataCleaner
+# Plotly and the cleaner are imported inside the functions that use them
+# so a cold start doesn't pay for them before the first page is chosen
 
 # Page configuration
 st.set_page_config(
@@ -44,21 +42,337 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+DATA_DIR = Path("../data")
+# Bump CACHE_VERSION whenever the cleaned table schemas change
+CACHE_DIR = DATA_DIR / "_cache"
+CACHE_VERSION = 4
+
+
+def _cleaner_with(**tables):
+    """Build a cleaner around already-loaded tables"""
+    from src.data_cleaner import F1DataCleaner
+    
+    cleaner = F1DataCleaner(data_dir=DATA_DIR)
+    for name, table in tables.items():
+        setattr(cleaner, name, table)
+    return cleaner
+
+
+# The disk-persisted loaders below take no arguments, so a fresh data_loader
+# run would never reach them; drop every cached table when the CSVs change
+INPUTS_FINGERPRINT = _cleaner_with()._inputs_fingerprint()[:16]
+_fingerprint_path = CACHE_DIR / "dashboard.key"
+if not _fingerprint_path.exists() or _fingerprint_path.read_text() != INPUTS_FINGERPRINT:
+    st.cache_data.clear()
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in CACHE_DIR.glob("*.v*.parquet"):
+        stale.unlink()
+    _fingerprint_path.write_text(INPUTS_FINGERPRINT)
+
+
 # Load data
-@st.cache_data
-def load_data():
-    """Load and clean F1 data"""
-    data_dir = Path("../data")
-    cleaner = F1DataCleaner(data_dir=data_dir)
+@st.cache_data(show_spinner=False, persist="disk")
+def load_raw():
+    """Load raw F1 tables from CSV"""
+    from src.data_cleaner import F1DataCleaner
+    
+    cleaner = F1DataCleaner(data_dir=DATA_DIR)
     cleaner.load_data()
-    cleaner.clean_races()
-    cleaner.clean_drivers()
-    cleaner.clean_results()
-    cleaner.clean_qualifying()
-    cleaner.clean_pitstops()
-    merged_df = cleaner.merge_data()
-    aggregated = cleaner.create_aggregated_tables()
-    return cleaner, merged_df, aggregated
+    return {
+        'races': cleaner.races,
+        'drivers': cleaner.drivers,
+        'constructors': cleaner.constructors,
+        'results': cleaner.results,
+        'qualifying': cleaner.qualifying,
+        'pitstops': cleaner.pitstops,
+        'circuits': cleaner.circuits
+    }
+
+
+def _compact_dtypes(df):
+    """Shrink numeric columns to the narrowest dtype (text is already Arrow-backed str)"""
+    for col in df.select_dtypes('integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes('float').columns:
+        df[col] = pd.to_numeric(df[col], downcast='float')
+    return df
+
+
+def _read_or_build(name, build):
+    """Read a table from the Parquet cache, building and writing it on a miss"""
+    path = CACHE_DIR / f"{name}.v{CACHE_VERSION}.{INPUTS_FINGERPRINT}.parquet"
+    if path.exists():
+        return pd.read_parquet(path, engine='pyarrow', use_threads=True, memory_map=True)
+    
+    df = build()
+    if df is not None:
+        df = _compact_dtypes(df)
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(path, engine='pyarrow', compression='zstd')
+    return df
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_clean_races():
+    """Clean races table"""
+    return _cleaner_with(races=load_raw()['races']).clean_races().races
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_clean_drivers():
+    """Clean drivers table"""
+    return _read_or_build(
+        'drivers',
+        lambda: _cleaner_with(drivers=load_raw()['drivers']).clean_drivers().drivers
+    )
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_clean_results():
+    """Clean results table"""
+    return _cleaner_with(results=load_raw()['results']).clean_results().results
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_clean_qualifying():
+    """Clean qualifying table"""
+    return _cleaner_with(qualifying=load_raw()['qualifying']).clean_qualifying().qualifying
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_clean_pitstops():
+    """Clean pit stops table"""
+    return _read_or_build(
+        'pitstops',
+        lambda: _cleaner_with(pitstops=load_raw()['pitstops']).clean_pitstops().pitstops
+    )
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_merged():
+    """Merge cleaned tables into the analysis dataset"""
+    def build():
+        raw = load_raw()
+        cleaner = _cleaner_with(
+            results=load_clean_results(),
+            races=load_clean_races(),
+            drivers=load_clean_drivers(),
+            constructors=raw['constructors'],
+            circuits=raw['circuits'],
+            qualifying=load_clean_qualifying()
+        )
+        merged = cleaner.merge_data()
+        
+        # Integer-coded keys take pandas' fast groupby path
+        for col in ['driverId', 'constructorId', 'full_name', 'constructor_name', 'circuit_name']:
+            if col in merged.columns:
+                merged[col] = merged[col].astype('category')
+        
+        return merged.sort_values('year', kind='stable').reset_index(drop=True)
+    
+    return _read_or_build('merged', build)
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_pair_stats():
+    """Per driver/constructor pair totals, shared by the driver and constructor career tables"""
+    return _cleaner_with(results=load_clean_results())._pair_stats()
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_driver_stats():
+    """Aggregate career statistics per driver"""
+    return _read_or_build(
+        'driver_stats',
+        lambda: _cleaner_with(drivers=load_clean_drivers()).create_driver_stats(load_pair_stats())
+    )
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_constructor_stats():
+    """Aggregate career statistics per constructor"""
+    return _read_or_build(
+        'constructor_stats',
+        lambda: _cleaner_with(
+            constructors=load_raw()['constructors']
+        ).create_constructor_stats(load_pair_stats())
+    )
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_year_rows():
+    """Row positions of each season in the year-sorted merged frame"""
+    return load_merged().groupby('year', sort=False).indices
+
+
+@st.cache_data(show_spinner=False)
+def load_year_options():
+    """Seasons in the merged dataset, newest first"""
+    return tuple(sorted(load_merged()['year'].unique(), reverse=True))
+
+
+@st.cache_data(show_spinner=False)
+def load_driver_names():
+    """Sorted driver names for selection widgets"""
+    return tuple(sorted(load_driver_stats()['full_name'].dropna().unique()))
+
+
+@st.cache_data(show_spinner=False)
+def load_constructor_names():
+    """Sorted constructor names for selection widgets"""
+    return tuple(sorted(load_constructor_stats()['name'].dropna().unique()))
+
+
+@st.cache_data(show_spinner=False)
+def load_driver_ids():
+    """Map driver full name to driverId (first match wins)"""
+    driver_stats = load_driver_stats().drop_duplicates('full_name')
+    return dict(zip(driver_stats['full_name'], driver_stats['driverId']))
+
+
+@st.cache_data(show_spinner=False)
+def load_constructor_ids():
+    """Map constructor name to constructorId (first match wins)"""
+    constructor_stats = load_constructor_stats().drop_duplicates('name')
+    return dict(zip(constructor_stats['name'], constructor_stats['constructorId']))
+
+
+def _year_stats(df, key):
+    """Aggregate points, wins and average finish per key and season"""
+    return (
+        df.groupby([key, 'year'], observed=True, sort=False)
+        .agg(points=('points', 'sum'), wins=('is_win', 'sum'), avg_position=('position', 'mean'))
+        .sort_index()
+    )
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_driver_year_stats():
+    """Season-by-season driver statistics indexed by (driverId, year)"""
+    return _year_stats(load_merged(), 'driverId')
+
+
+@st.cache_data(show_spinner=False, persist="disk")
+def load_constructor_year_stats():
+    """Season-by-season constructor statistics indexed by (constructorId, year)"""
+    return _year_stats(load_merged(), 'constructorId')
+
+
+# Per-page aggregates. Frames passed as underscore arguments are not hashed by
+# Streamlit; they are fully determined by the selected years, which key the cache.
+# Each distinct year selection adds an entry, so only the most recent ones are kept.
+YEAR_CACHE_ENTRIES = 32
+
+
+@st.cache_data(show_spinner=False, max_entries=YEAR_CACHE_ENTRIES)
+def _pit_df_for_years(years, _pitstops):
+    """Pit stops within the selected years"""
+    return _pitstops[_pitstops['year'].isin(years)]
+
+
+@st.cache_data(show_spinner=False, max_entries=YEAR_CACHE_ENTRIES)
+def _pit_kpis(years, _pit_df):
+    """Pit duration summary and average stops per driver per race"""
+    kpis = _pit_df['duration_seconds'].agg(['mean', 'min', 'median', 'max']).to_dict()
+    kpis['stops_per_race'] = _pit_df.groupby(['raceId', 'year', 'driverId'], observed=True, sort=False).size().mean()
+    return kpis
+
+
+@st.cache_data(show_spinner=False, max_entries=YEAR_CACHE_ENTRIES)
+def _duration_hist(years, _pit_df):
+    """Histogram counts and bin edges of pit stop durations"""
+    return np.histogram(_pit_df['duration_seconds'].dropna().to_numpy(), bins=50)
+
+
+@st.cache_data(show_spinner=False, max_entries=YEAR_CACHE_ENTRIES)
+def _pit_by_year(years, _pit_df):
+    """Average pit duration and stop count per season"""
+    pit_by_year = _pit_df.groupby('year').agg({
+        'duration_seconds': 'mean',
+        'stop': 'count'
+    }).reset_index()
+    pit_by_year.columns = ['year', 'avg_duration', 'total_stops']
+    return pit_by_year
+
+
+@st.cache_data(show_spinner=False, max_entries=YEAR_CACHE_ENTRIES)
+def _pit_by_driver(years, _pit_df, _drivers):
+    """The 20 drivers with the fastest average pit stop"""
+    pit_by_driver = _pit_df.groupby('driverId', observed=True, sort=False)['duration_seconds'].mean().reset_index()
+    pit_by_driver = pit_by_driver.merge(
+        _drivers[['driverId', 'full_name']],
+        on='driverId',
+        how='left'
+    )
+    return pit_by_driver.sort_values('duration_seconds').head(20)
+
+
+@st.cache_data(show_spinner=False, max_entries=YEAR_CACHE_ENTRIES)
+def _circuit_stats(years, _df):
+    """Races hosted, average finish and points per circuit"""
+    circuit_stats = _df.groupby('circuit_name', observed=True, sort=False).agg({
+        'raceId': 'nunique',
+        'position': 'mean',
+        'points': 'sum'
+    }).reset_index()
+    circuit_stats.columns = ['circuit', 'races', 'avg_position', 'total_points']
+    return circuit_stats.sort_values('races', ascending=False)
+
+
+@st.cache_data(show_spinner=False, max_entries=YEAR_CACHE_ENTRIES)
+def _qual_vs_race(years, _df):
+    """Qualifying/finish correlation and result counts per (qualifying, finish) cell"""
+    qual = _df['qualifying_position'].to_numpy(dtype=float)
+    pos = _df['position'].to_numpy(dtype=float)
+    mask = ~np.isnan(qual) & ~np.isnan(pos)
+    if not mask.any():
+        return np.nan, pd.DataFrame(columns=['qualifying_position', 'position', 'n'])
+    qual, pos = qual[mask], pos[mask]
+    
+    correlation = np.corrcoef(qual, pos)[0, 1]
+    # Both axes are small integers, so plot counts per grid cell instead of every row
+    cells, n = np.unique(np.column_stack([qual, pos]), axis=0, return_counts=True)
+    counts = pd.DataFrame({'qualifying_position': cells[:, 0], 'position': cells[:, 1], 'n': n})
+    return correlation, counts
+
+
+@st.cache_data(show_spinner=False, max_entries=YEAR_CACHE_ENTRIES)
+def _dnf_by_circuit(years, _df):
+    """The 15 circuits with the highest DNF rate (min 5 results)"""
+    dnf_by_circuit = _df.groupby('circuit_name', observed=True, sort=False).agg({
+        'is_dnf': ['sum', 'mean', 'count']
+    }).reset_index()
+    dnf_by_circuit.columns = ['circuit', 'total_dnfs', 'dnf_rate', 'races']
+    return dnf_by_circuit[dnf_by_circuit['races'] >= 5].sort_values('dnf_rate', ascending=False).head(15)
+
+
+def make_time_series_subplot(df, x, y1, y2, title, key):
+    """Two-axis line chart of y1 and y2 over x, reusing the figure kept in session state"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
+    fig = st.session_state.get(key)
+    if fig is None:
+        y1_name = y1.replace('_', ' ').title()
+        y2_name = y2.replace('_', ' ').title()
+        fig = make_subplots(specs=[[{"secondary_y": True}]])
+        fig.add_trace(go.Scatter(name=y1_name, line=dict(color='blue')), secondary_y=False)
+        fig.add_trace(go.Scatter(name=y2_name, line=dict(color='red')), secondary_y=True)
+        fig.update_xaxes(title_text=x.replace('_', ' ').title())
+        fig.update_yaxes(title_text=y1_name, secondary_y=False)
+        fig.update_yaxes(title_text=y2_name, secondary_y=True)
+        st.session_state[key] = fig
+    
+    # Only the trace arrays and title change between reruns
+    x_values = df[x].to_numpy()
+    with fig.batch_update():
+        fig.data[0].x = x_values
+        fig.data[0].y = df[y1].to_numpy()
+        fig.data[1].x = x_values
+        fig.data[1].y = df[y2].to_numpy()
+        fig.layout.title = title
+    return fig
+
 
 # Main app
 def main():
@@ -66,7 +380,7 @@ def main():
     
     # Load data
     with st.spinner("Loading F1 data..."):
-        cleaner, merged_df, aggregated = load_data()
+        merged_df = load_merged()
     
     # Sidebar navigation
     st.sidebar.title("Navigation")
@@ -76,7 +390,7 @@ def main():
     )
     
     # Year filter
-    years = sorted(merged_df['year'].unique(), reverse=True)
+    years = load_year_options()
     selected_years = st.sidebar.multiselect(
         "Select Years",
         years,
@@ -87,27 +401,38 @@ def main():
         st.warning("Please select at least one year")
         return
     
-    filtered_df = merged_df[merged_df['year'].isin(selected_years)]
+    selected_years = tuple(sorted(selected_years))
+    year_rows = load_year_rows()
+    row_idx = np.concatenate([year_rows[year] for year in selected_years])
+    filtered_df = merged_df.take(row_idx)
     
     # Page routing
     if page == "🏁 Driver Insights":
-        driver_insights_page(cleaner, filtered_df, aggregated)
+        driver_stats = load_driver_stats()
+        driver_year_stats = load_driver_year_stats()
+        driver_insights_page(filtered_df, selected_years, driver_stats, driver_year_stats)
     elif page == "🏎️ Constructor Comparison":
-        constructor_comparison_page(cleaner, filtered_df, aggregated)
+        constructor_stats = load_constructor_stats()
+        constructor_year_stats = load_constructor_year_stats()
+        constructor_comparison_page(filtered_df, selected_years, constructor_stats, constructor_year_stats)
     elif page == "⏱️ Pit Stop Analysis":
-        pitstop_analysis_page(cleaner, filtered_df)
+        pitstops = load_clean_pitstops()
+        drivers = load_clean_drivers()
+        pitstop_analysis_page(filtered_df, selected_years, pitstops, drivers)
     elif page == "🌦️ Circuit & Weather Impact":
-        circuit_analysis_page(cleaner, filtered_df)
+        circuit_analysis_page(filtered_df, selected_years)
 
 
-def driver_insights_page(cleaner, df, aggregated):
+def driver_insights_page(df, selected_years, driver_stats, driver_year_stats):
     """Driver insights page"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
     st.header("🏁 Driver Performance Insights")
     
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
     
-    driver_stats = aggregated['driver_stats'].copy()
     top_driver = driver_stats.nlargest(1, 'wins').iloc[0]
     
     with col1:
@@ -126,22 +451,25 @@ def driver_insights_page(cleaner, df, aggregated):
     top_n = st.slider("Number of drivers to show", 5, 20, 10)
     top_drivers = driver_stats.nlargest(top_n, 'wins')
     
-    fig = px.bar(
-        top_drivers,
-        x='wins',
-        y='full_name',
+    wins = top_drivers['wins'].to_numpy()
+    fig = go.Figure(go.Bar(
+        x=wins,
+        y=top_drivers['full_name'].to_numpy(),
         orientation='h',
-        color='wins',
-        color_continuous_scale='Reds',
-        labels={'wins': 'Number of Wins', 'full_name': 'Driver'},
-        title=f'Top {top_n} Drivers by Race Wins'
+        marker=dict(color=wins, colorscale='Reds', showscale=True, colorbar=dict(title='Number of Wins'))
+    ))
+    fig.update_layout(
+        title=f'Top {top_n} Drivers by Race Wins',
+        xaxis_title='Number of Wins',
+        yaxis_title='Driver',
+        yaxis={'categoryorder': 'total ascending'},
+        height=400
     )
-    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
     st.plotly_chart(fig, use_container_width=True)
     
     # Driver comparison
     st.subheader("Compare Drivers")
-    driver_list = sorted(driver_stats['full_name'].dropna().unique())
+    driver_list = load_driver_names()
     selected_drivers = st.multiselect("Select drivers to compare", driver_list, default=driver_list[:3])
     
     if selected_drivers:
@@ -178,35 +506,24 @@ def driver_insights_page(cleaner, df, aggregated):
     selected_driver = st.selectbox("Select driver", driver_list)
     
     if selected_driver:
-        driver_id = driver_stats[driver_stats['full_name'] == selected_driver]['driverId'].values[0]
-        driver_history = df[df['driverId'] == driver_id].groupby('year').agg({
-            'points': 'sum',
-            'position': 'mean',
-            'position': lambda x: (x == 1).sum()  # Wins
-        }).reset_index()
-        driver_history.columns = ['year', 'points', 'avg_position', 'wins']
+        driver_id = load_driver_ids()[selected_driver]
+        driver_history = driver_year_stats.loc[driver_id].reset_index()
+        driver_history = driver_history[driver_history['year'].isin(selected_years)]
         
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        fig.add_trace(
-            go.Scatter(x=driver_history['year'], y=driver_history['points'], name="Points", line=dict(color='blue')),
-            secondary_y=False
+        fig = make_time_series_subplot(
+            driver_history, 'year', 'points', 'wins',
+            title=f"{selected_driver} - Performance Over Time",
+            key='driver_history_fig'
         )
-        fig.add_trace(
-            go.Scatter(x=driver_history['year'], y=driver_history['wins'], name="Wins", line=dict(color='red')),
-            secondary_y=True
-        )
-        fig.update_xaxes(title_text="Year")
-        fig.update_yaxes(title_text="Points", secondary_y=False)
-        fig.update_yaxes(title_text="Wins", secondary_y=True)
-        fig.update_layout(title=f"{selected_driver} - Performance Over Time")
         st.plotly_chart(fig, use_container_width=True)
 
 
-def constructor_comparison_page(cleaner, df, aggregated):
+def constructor_comparison_page(df, selected_years, constructor_stats, constructor_year_stats):
     """Constructor comparison page"""
-    st.header("🏎️ Constructor Performance Comparison")
+    import plotly.express as px
+    import plotly.graph_objects as go
     
-    constructor_stats = aggregated['constructor_stats'].copy()
+    st.header("🏎️ Constructor Performance Comparison")
     
     # KPIs
     col1, col2, col3, col4 = st.columns(4)
@@ -229,22 +546,25 @@ def constructor_comparison_page(cleaner, df, aggregated):
     top_n = st.slider("Number of constructors to show", 5, 20, 10, key="constructor_slider")
     top_constructors = constructor_stats.nlargest(top_n, 'wins')
     
-    fig = px.bar(
-        top_constructors,
-        x='wins',
-        y='name',
+    wins = top_constructors['wins'].to_numpy()
+    fig = go.Figure(go.Bar(
+        x=wins,
+        y=top_constructors['name'].to_numpy(),
         orientation='h',
-        color='wins',
-        color_continuous_scale='Blues',
-        labels={'wins': 'Number of Wins', 'name': 'Constructor'},
-        title=f'Top {top_n} Constructors by Race Wins'
+        marker=dict(color=wins, colorscale='Blues', showscale=True, colorbar=dict(title='Number of Wins'))
+    ))
+    fig.update_layout(
+        title=f'Top {top_n} Constructors by Race Wins',
+        xaxis_title='Number of Wins',
+        yaxis_title='Constructor',
+        yaxis={'categoryorder': 'total ascending'},
+        height=400
     )
-    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=400)
     st.plotly_chart(fig, use_container_width=True)
     
     # Constructor comparison
     st.subheader("Compare Constructors")
-    constructor_list = sorted(constructor_stats['name'].dropna().unique())
+    constructor_list = load_constructor_names()
     selected_constructors = st.multiselect("Select constructors", constructor_list, default=constructor_list[:3])
     
     if selected_constructors:
@@ -281,75 +601,62 @@ def constructor_comparison_page(cleaner, df, aggregated):
     selected_constructor = st.selectbox("Select constructor", constructor_list)
     
     if selected_constructor:
-        constructor_id = constructor_stats[constructor_stats['name'] == selected_constructor]['constructorId'].values[0]
-        constructor_history = df[df['constructorId'] == constructor_id].groupby('year').agg({
-            'points': 'sum',
-            'position': lambda x: (x == 1).sum()
-        }).reset_index()
-        constructor_history.columns = ['year', 'points', 'wins']
+        constructor_id = load_constructor_ids()[selected_constructor]
+        constructor_history = constructor_year_stats.loc[constructor_id].reset_index()
+        constructor_history = constructor_history[constructor_history['year'].isin(selected_years)]
         
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        fig.add_trace(
-            go.Scatter(x=constructor_history['year'], y=constructor_history['points'], name="Points", line=dict(color='blue')),
-            secondary_y=False
-        )
-        fig.add_trace(
-            go.Scatter(x=constructor_history['year'], y=constructor_history['wins'], name="Wins", line=dict(color='red')),
-            secondary_y=True
+        fig = make_time_series_subplot(
+            constructor_history, 'year', 'points', 'wins',
+            title=f"{selected_constructor} - Performance Over Time",
+            key='constructor_history_fig'
         )
-        fig.update_xaxes(title_text="Year")
-        fig.update_yaxes(title_text="Points", secondary_y=False)
-        fig.update_yaxes(title_text="Wins", secondary_y=True)
-        fig.update_layout(title=f"{selected_constructor} - Performance Over Time")
         st.plotly_chart(fig, use_container_width=True)
 
 
-def pitstop_analysis_page(cleaner, df):
+def pitstop_analysis_page(df, selected_years, pitstops, drivers):
     """Pit stop analysis page"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    
     st.header("⏱️ Pit Stop Strategy Analysis")
     
-    if cleaner.pitstops is None or cleaner.pitstops.empty:
+    if pitstops is None or pitstops.empty:
         st.warning("Pit stop data not available for the selected period")
         return
     
     # KPIs
-    pit_df = cleaner.pitstops.copy()
-    pit_df = pit_df[pit_df['year'].isin(df['year'].unique())]
+    pit_df = _pit_df_for_years(selected_years, pitstops)
+    kpis = _pit_kpis(selected_years, pit_df)
+    avg_duration = kpis['mean']
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        avg_duration = pit_df['duration_seconds'].mean()
-        st.metric("Avg Pit Duration", f"{avg_duration:.2f}s", f"Fastest: {pit_df['duration_seconds'].min():.2f}s")
+        st.metric("Avg Pit Duration", f"{avg_duration:.2f}s", f"Fastest: {kpis['min']:.2f}s")
     with col2:
         total_stops = len(pit_df)
         st.metric("Total Pit Stops", f"{total_stops:,}", f"Avg per race: {total_stops/df['raceId'].nunique():.1f}")
     with col3:
-        median_duration = pit_df['duration_seconds'].median()
-        st.metric("Median Duration", f"{median_duration:.2f}s", f"Slowest: {pit_df['duration_seconds'].max():.2f}s")
+        st.metric("Median Duration", f"{kpis['median']:.2f}s", f"Slowest: {kpis['max']:.2f}s")
     with col4:
-        avg_stops_per_race = pit_df.groupby(['raceId', 'year', 'driverId']).size().mean()
-        st.metric("Avg Stops/Race", f"{avg_stops_per_race:.1f}", "Per driver")
+        st.metric("Avg Stops/Race", f"{kpis['stops_per_race']:.1f}", "Per driver")
     
     # Distribution
     st.subheader("Pit Stop Duration Distribution")
-    fig = px.histogram(
-        pit_df,
-        x='duration_seconds',
-        nbins=50,
+    counts, edges = _duration_hist(selected_years, pit_df)
+    fig = go.Figure(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges)))
+    fig.update_layout(
         title='Distribution of Pit Stop Durations',
-        labels={'duration_seconds': 'Duration (seconds)', 'count': 'Frequency'}
+        xaxis_title='Duration (seconds)',
+        yaxis_title='Frequency'
     )
     fig.add_vline(x=avg_duration, line_dash="dash", line_color="red", annotation_text=f"Mean: {avg_duration:.2f}s")
     st.plotly_chart(fig, use_container_width=True)
     
     # Trends over time
     st.subheader("Pit Stop Trends Over Time")
-    pit_by_year = pit_df.groupby('year').agg({
-        'duration_seconds': 'mean',
-        'stop': 'count'
-    }).reset_index()
-    pit_by_year.columns = ['year', 'avg_duration', 'total_stops']
+    pit_by_year = _pit_by_year(selected_years, pit_df)
     
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     fig.add_trace(
@@ -368,13 +675,7 @@ def pitstop_analysis_page(cleaner, df):
     
     # Pit stops by driver
     st.subheader("Pit Stop Performance by Driver")
-    pit_by_driver = pit_df.groupby('driverId')['duration_seconds'].mean().reset_index()
-    pit_by_driver = pit_by_driver.merge(
-        cleaner.drivers[['driverId', 'full_name']],
-        on='driverId',
-        how='left'
-    )
-    pit_by_driver = pit_by_driver.sort_values('duration_seconds').head(20)
+    pit_by_driver = _pit_by_driver(selected_years, pit_df, drivers)
     
     fig = px.bar(
         pit_by_driver,
@@ -388,8 +689,11 @@ def pitstop_analysis_page(cleaner, df):
     st.plotly_chart(fig, use_container_width=True)
 
 
-def circuit_analysis_page(cleaner, df):
+def circuit_analysis_page(df, selected_years):
     """Circuit and weather analysis page"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
     st.header("🌦️ Circuit & Weather Impact Analysis")
     
     if 'circuit_name' not in df.columns:
@@ -397,13 +701,7 @@ def circuit_analysis_page(cleaner, df):
         return
     
     # Circuit statistics
-    circuit_stats = df.groupby('circuit_name').agg({
-        'raceId': 'nunique',
-        'position': 'mean',
-        'points': 'sum'
-    }).reset_index()
-    circuit_stats.columns = ['circuit', 'races', 'avg_position', 'total_points']
-    circuit_stats = circuit_stats.sort_values('races', ascending=False)
+    circuit_stats = _circuit_stats(selected_years, df)
     
     st.subheader("Circuit Statistics")
     top_n_circuits = st.slider("Number of circuits to show", 5, 30, 15, key="circuit_slider")
@@ -424,23 +722,23 @@ def circuit_analysis_page(cleaner, df):
     
     # Qualifying vs Race Performance
     st.subheader("Qualifying vs Race Performance")
-    qual_race_data = df[['qualifying_position', 'position', 'circuit_name']].copy()
-    qual_race_data = qual_race_data.dropna(subset=['qualifying_position', 'position'])
+    correlation, counts = _qual_vs_race(selected_years, df)
     
-    if not qual_race_data.empty:
-        correlation = qual_race_data['qualifying_position'].corr(qual_race_data['position'])
+    if not counts.empty:
         st.metric("Correlation", f"{correlation:.3f}", "Higher = stronger predictor")
         
         fig = px.scatter(
-            qual_race_data,
+            counts,
             x='qualifying_position',
             y='position',
-            color='circuit_name',
+            size='n',
+            color='n',
             title='Qualifying Position vs Final Race Position',
-            labels={'qualifying_position': 'Qualifying Position', 'position': 'Final Position'},
-            opacity=0.6
+            labels={'qualifying_position': 'Qualifying Position', 'position': 'Final Position', 'n': 'Results'},
+            opacity=0.6,
+            render_mode='webgl'
         )
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=[1, 20], y=[1, 20],
             mode='lines',
             name='Perfect Correlation',
@@ -450,11 +748,7 @@ def circuit_analysis_page(cleaner, df):
     
     # DNF Analysis by Circuit
     st.subheader("DNF Rate by Circuit")
-    dnf_by_circuit = df.groupby('circuit_name').agg({
-        'is_dnf': ['sum', 'mean', 'count']
-    }).reset_index()
-    dnf_by_circuit.columns = ['circuit', 'total_dnfs', 'dnf_rate', 'races']
-    dnf_by_circuit = dnf_by_circuit[dnf_by_circuit['races'] >= 5].sort_values('dnf_rate', ascending=False).head(15)
+    dnf_by_circuit = _dnf_by_circuit(selected_years, df)
     
     fig = px.bar(
         dnf_by_circuit,
@@ -3,11 +3,90 @@ Formula 1 Data Cleaning and Preparation
 Handles missing values, data normalization, and merging of tables
 """
 
+import hashlib
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 from pathlib import Path
 
 
+# Finishing statuses that count as a did-not-finish
+DNF_STATUSES = frozenset([
+    'Accident', 'Collision', 'Engine', 'Gearbox', 'Hydraulics',
+    'Electrical', 'Spun off', 'Radiator', 'Suspension', 'Brakes',
+    'Differential', 'Overheating', 'Mechanical', 'Tyre', 'Driver',
+    'Puncture', 'Driveshaft', 'Retired', 'Fuel pressure', 'Clutch',
+    'Wheel', 'Technical', 'Electronics', 'Broken wing', 'Heat shield',
+    'Exhaust', 'Oil leak', 'Wheel rim', 'Water leak', 'Fuel leak',
+    'Transmission', 'Turbo', 'Water pump', 'Power Unit', 'ERS',
+    'Oil pressure', 'Power loss', 'Vibrations', '107% Rule', 'Safety',
+    'Drivetrain', 'Ignition', 'Damage', 'Debris', 'Illness', 'Injury'
+])
+
+# Numeric dtypes applied by read_csv, so cleaning doesn't re-parse these columns.
+# Columns that can be missing are floats; ids and years are always present.
+DTYPES = {
+    'races': {'raceId': 'int32', 'year': 'int16', 'round': 'int16'},
+    'drivers': {'number': 'float32'},
+    'results': {
+        'resultId': 'int32', 'raceId': 'int32', 'year': 'int16', 'number': 'float32',
+        'grid': 'float32', 'position': 'float32',
+        'positionOrder': 'float32', 'points': 'float32', 'laps': 'float32',
+        'milliseconds': 'float64', 'fastestLap': 'float32', 'rank': 'float32'
+    },
+    'qualifying': {'raceId': 'int32', 'year': 'int16', 'position': 'float32', 'number': 'float32'},
+    'pitstops': {'raceId': 'int32', 'year': 'int16', 'stop': 'int8', 'lap': 'int16'},
+    'laptimes': {'raceId': 'int32', 'year': 'int16', 'lap': 'int16', 'position': 'float32'}
+}
+
+# Non-numeric markers read as missing ('R', 'D', ... are retirement/disqualification codes)
+NA_VALUES = {
+    'results': {'position': ['\\N', 'R', 'D', 'E', 'W', 'F', 'N']}
+}
+
+# Columns kept from each table; the rest (urls, refs, raw time strings) are
+# never used downstream, so they are skipped at parse time. Every listed column
+# is required, so the cleaning steps use them without checking
+USECOLS = {
+    'races': ['raceId', 'year', 'round', 'circuitId', 'name', 'date'],
+    'drivers': ['driverId', 'number', 'code', 'forename', 'surname', 'dob', 'nationality'],
+    'constructors': ['constructorId', 'name', 'nationality'],
+    'circuits': ['circuitId', 'name', 'country', 'lat', 'lng'],
+    'results': [
+        'resultId', 'raceId', 'year', 'driverId', 'constructorId', 'number', 'grid',
+        'position', 'positionOrder', 'points', 'laps', 'milliseconds', 'fastestLap',
+        'rank', 'status'
+    ],
+    'qualifying': ['raceId', 'year', 'driverId', 'constructorId', 'number', 'position', 'q1', 'q2', 'q3'],
+    'pitstops': ['raceId', 'year', 'driverId', 'stop', 'lap', 'duration']
+}
+
+# Low-cardinality labels, read straight into categoricals
+CATEGORICAL = {
+    'results': ['status'],
+    'drivers': ['nationality', 'code'],
+    'constructors': ['nationality'],
+    'circuits': ['country']
+}
+
+# Tables load_data reads, in the order it reads them
+CLEANED_TABLES = [
+    'races', 'drivers', 'constructors', 'results',
+    'qualifying', 'pitstops', 'laptimes', 'circuits'
+]
+
+DATE_COLUMNS = {
+    'races': ['date'],
+    'drivers': ['dob']
+}
+
+
+def _race_key(df):
+    """Pack (year, raceId) into one int64 join key; raceId is the round, so it repeats every season"""
+    return df['year'].to_numpy(dtype='int64') * 1000 + df['raceId'].to_numpy(dtype='int64')
+
+
 class F1DataCleaner:
     """Clean and prepare F1 data for analysis"""
     
@@ -26,36 +105,46 @@ class F1DataCleaner:
         """Load all CSV files"""
         print("Loading data files...")
         
-        self.races = pd.read_csv(self.data_dir / "races.csv")
-        self.drivers = pd.read_csv(self.data_dir / "drivers.csv")
-        self.constructors = pd.read_csv(self.data_dir / "constructors.csv")
-        self.results = pd.read_csv(self.data_dir / "results.csv")
+        self.races = self._read_csv("races")
+        self.drivers = self._read_csv("drivers")
+        self.constructors = self._read_csv("constructors")
+        self.results = self._read_csv("results")
         
         # Optional files
         if (self.data_dir / "qualifying.csv").exists():
-            self.qualifying = pd.read_csv(self.data_dir / "qualifying.csv")
+            self.qualifying = self._read_csv("qualifying")
         if (self.data_dir / "pitstops.csv").exists():
-            self.pitstops = pd.read_csv(self.data_dir / "pitstops.csv")
+            self.pitstops = self._read_csv("pitstops")
         if (self.data_dir / "laptimes.csv").exists():
-            self.laptimes = pd.read_csv(self.data_dir / "laptimes.csv")
+            self.laptimes = self._read_csv("laptimes")
         if (self.data_dir / "circuits.csv").exists():
-            self.circuits = pd.read_csv(self.data_dir / "circuits.csv")
+            self.circuits = self._read_csv("circuits")
         
         print("Data loaded successfully!")
         return self
     
+    def _read_csv(self, name):
+        """Read one table, parsing numeric and date columns to their final dtypes"""
+        # The multithreaded pyarrow parser can't take per-column NA markers,
+        # so tables that need them stay on the C parser
+        na_values = NA_VALUES.get(name)
+        dtype = {**DTYPES.get(name, {}), **dict.fromkeys(CATEGORICAL.get(name, []), 'category')}
+        return pd.read_csv(
+            self.data_dir / f"{name}.csv",
+            engine='c' if na_values else 'pyarrow',
+            usecols=USECOLS.get(name),
+            dtype=dtype or None,
+            na_values=na_values,
+            parse_dates=DATE_COLUMNS.get(name, False)
+        )
+    
     def clean_races(self):
         """Clean races data"""
         if self.races is None:
             return self
         
         # Convert date to datetime
-        if 'date' in self.races.columns:
-            self.races['date'] = pd.to_datetime(self.races['date'], errors='coerce')
-        
-        # Ensure raceId is numeric
-        self.races['raceId'] = pd.to_numeric(self.races['raceId'], errors='coerce')
-        self.races['year'] = pd.to_numeric(self.races['year'], errors='coerce')
+        self.races['date'] = pd.to_datetime(self.races['date'], errors='coerce')
         
         # Drop duplicates
         self.races = self.races.drop_duplicates(subset=['year', 'round'])
@@ -67,15 +156,19 @@ class F1DataCleaner:
         if self.drivers is None:
             return self
         
-        # Create full name
-        self.drivers['full_name'] = (
-            self.drivers['forename'].fillna('') + ' ' + 
-            self.drivers['surname'].fillna('')
-        ).str.strip()
+        # Create full name in one Arrow kernel pass (missing parts join as '')
+        forename = pa.array(self.drivers['forename'], from_pandas=True)
+        surname = pa.array(self.drivers['surname'], from_pandas=True).cast(forename.type)
+        full_name = pc.binary_join_element_wise(
+            forename, surname, pa.scalar(' ', forename.type),
+            null_handling='replace', null_replacement=''
+        )
+        self.drivers['full_name'] = pd.Series(
+            pc.utf8_trim_whitespace(full_name).to_pandas(), index=self.drivers.index
+        )
         
         # Convert DOB to datetime
-        if 'dob' in self.drivers.columns:
-            self.drivers['dob'] = pd.to_datetime(self.drivers['dob'], errors='coerce')
+        self.drivers['dob'] = pd.to_datetime(self.drivers['dob'], errors='coerce')
         
         return self
     
@@ -84,41 +177,20 @@ class F1DataCleaner:
         if self.results is None:
             return self
         
-        # Convert numeric columns
-        numeric_cols = ['raceId', 'year', 'grid', 'position', 'positionOrder', 
-                       'points', 'laps', 'milliseconds', 'fastestLap', 'rank']
-        for col in numeric_cols:
-            if col in self.results.columns:
-                self.results[col] = pd.to_numeric(self.results[col], errors='coerce')
-        
-        # Handle position - convert 'R', 'D', 'E', 'W', 'F', 'N' to NaN
-        if 'position' in self.results.columns:
-            self.results['position'] = pd.to_numeric(
-                self.results['position'], 
-                errors='coerce'
-            )
+        # Create DNF flag: test the handful of distinct statuses once, then gather by
+        # category code; the trailing False is picked up by code -1 (missing status)
+        status = self.results['status'].astype('category')
+        dnf_lookup = np.append(status.cat.categories.isin(DNF_STATUSES), False)
+        self.results['is_dnf'] = dnf_lookup[status.cat.codes.to_numpy()]
         
-        # Create DNF flag
-        if 'status' in self.results.columns:
-            dnf_statuses = ['Accident', 'Collision', 'Engine', 'Gearbox', 'Hydraulics',
-                          'Electrical', 'Spun off', 'Radiator', 'Suspension', 'Brakes',
-                          'Differential', 'Overheating', 'Mechanical', 'Tyre', 'Driver',
-                          'Puncture', 'Driveshaft', 'Retired', 'Fuel pressure', 'Clutch',
-                          'Wheel', 'Technical', 'Electronics', 'Broken wing', 'Heat shield',
-                          'Exhaust', 'Oil leak', 'Wheel rim', 'Water leak', 'Fuel leak',
-                          'Transmission', 'Turbo', 'Water pump', 'Power Unit', 'ERS',
-                          'Oil pressure', 'Power loss', 'Vibrations', '107% Rule', 'Safety',
-                          'Drivetrain', 'Ignition', 'Damage', 'Debris', 'Illness', 'Injury']
-            
-            self.results['is_dnf'] = self.results['status'].isin(dnf_statuses)
-        else:
-            self.results['is_dnf'] = False
+        # Win / podium flags for vectorized counting
+        self.results['is_win'] = (self.results['position'] == 1).astype('int8')
+        self.results['is_podium'] = (self.results['position'] <= 3).astype('int8')
         
         # Calculate position change (grid to finish)
-        if 'grid' in self.results.columns and 'position' in self.results.columns:
-            self.results['position_change'] = (
-                self.results['grid'] - self.results['position']
-            )
+        self.results['position_change'] = (
+            self.results['grid'] - self.results['position']
+        )
         
         return self
     
@@ -127,21 +199,12 @@ class F1DataCleaner:
         if self.qualifying is None:
             return self
         
-        # Convert numeric columns
-        numeric_cols = ['raceId', 'year', 'position', 'number']
-        for col in numeric_cols:
-            if col in self.qualifying.columns:
-                self.qualifying[col] = pd.to_numeric(
-                    self.qualifying[col], errors='coerce'
-                )
-        
         # Convert time columns to seconds
         time_cols = ['q1', 'q2', 'q3']
         for col in time_cols:
-            if col in self.qualifying.columns:
-                self.qualifying[f'{col}_seconds'] = self.qualifying[col].apply(
-                    self._time_to_seconds
-                )
+            self.qualifying[f'{col}_seconds'] = self._time_to_seconds_vec(
+                self.qualifying[col]
+            )
         
         return self
     
@@ -150,19 +213,10 @@ class F1DataCleaner:
         if self.pitstops is None:
             return self
         
-        # Convert numeric columns
-        numeric_cols = ['raceId', 'year', 'stop', 'lap']
-        for col in numeric_cols:
-            if col in self.pitstops.columns:
-                self.pitstops[col] = pd.to_numeric(
-                    self.pitstops[col], errors='coerce'
-                )
-        
         # Convert duration to seconds
-        if 'duration' in self.pitstops.columns:
-            self.pitstops['duration_seconds'] = self.pitstops['duration'].apply(
-                self._time_to_seconds
-            )
+        self.pitstops['duration_seconds'] = self._time_to_seconds_vec(
+            self.pitstops['duration']
+        )
         
         return self
     
@@ -171,18 +225,10 @@ class F1DataCleaner:
         if self.laptimes is None:
             return self
         
-        # Convert numeric columns
-        numeric_cols = ['raceId', 'year', 'lap', 'position']
-        for col in numeric_cols:
-            if col in self.laptimes.columns:
-                self.laptimes[col] = pd.to_numeric(
-                    self.laptimes[col], errors='coerce'
-                )
-        
         # Convert time to seconds
         if 'time' in self.laptimes.columns:
-            self.laptimes['time_seconds'] = self.laptimes['time'].apply(
-                self._time_to_seconds
+            self.laptimes['time_seconds'] = self._time_to_seconds_vec(
+                self.laptimes['time']
             )
         
         return self
@@ -203,87 +249,138 @@ class F1DataCleaner:
         except:
             return np.nan
     
+    def _time_to_seconds_vec(self, series):
+        """Convert a column of time strings (MM:SS.mmm) to seconds, vectorized"""
+        # Same rules as _time_to_seconds: optional integer minutes, then seconds
+        parts = series.astype('string').str.extract(r'^(?:\s*([+-]?\d+)\s*:)?([^:]*)$')
+        minutes = pd.to_numeric(parts[0], errors='coerce').fillna(0)
+        seconds = pd.to_numeric(parts[1], errors='coerce')
+        return (minutes * 60 + seconds).astype('float32')
+    
+    def _encode_keys(self, merged):
+        """Give each string join key one categorical dtype shared by every table,
+        so merges on it compare integer codes instead of hashing strings, and
+        index the lookup tables by their keys"""
+        tables = {
+            'merged': merged, 'races': self.races, 'drivers': self.drivers,
+            'constructors': self.constructors, 'circuits': self.circuits,
+            'qualifying': self.qualifying
+        }
+        tables = {name: df for name, df in tables.items() if df is not None}
+        
+        for key in ['driverId', 'constructorId', 'circuitId']:
+            holders = [name for name, df in tables.items() if key in df.columns]
+            values = pd.concat([tables[name][key] for name in holders], ignore_index=True)
+            dtype = pd.CategoricalDtype(values.dropna().unique())
+            for name in holders:
+                tables[name] = tables[name].assign(**{key: tables[name][key].astype(dtype)})
+        
+        # Lookup tables are indexed by their primary key once, so the
+        # left joins against them probe a prebuilt index
+        for name, key in [('drivers', 'driverId'), ('constructors', 'constructorId'), ('circuits', 'circuitId')]:
+            if name in tables:
+                tables[name] = tables[name].set_index(key)
+        
+        return tables
+    
     def merge_data(self):
         """Merge all tables into a comprehensive dataset"""
         print("Merging data tables...")
         
-        # Start with results
-        merged = self.results.copy()
+        # Start with results; under copy-on-write assign doesn't copy the existing columns.
+        # results (the largest table) stays on the left of every merge and join below,
+        # so the hash table is always built on the smaller, key-unique right side
+        merged = self.results.assign(_race_key=_race_key(self.results))
+        tables = self._encode_keys(merged)
+        merged = tables['merged']
         
-        # Merge with races
+        # Merge with races; year and raceId come from results
         if self.races is not None:
+            races = tables['races'][['round', 'circuitId', 'name', 'date']].assign(
+                _race_key=_race_key(self.races)
+            )
             merged = merged.merge(
-                self.races[['raceId', 'year', 'round', 'circuitId', 'name', 'date']],
-                on=['raceId', 'year'],
+                races.rename(columns={'name': 'race_name'}),
+                on='_race_key',
                 how='left',
-                suffixes=('', '_race')
+                suffixes=('', '_race'),
+                validate='many_to_one'
             )
-            merged = merged.rename(columns={'name': 'race_name'})
         
         # Merge with drivers
         if self.drivers is not None:
-            merged = merged.merge(
-                self.drivers[['driverId', 'full_name', 'nationality', 'code']],
-                on='driverId',
-                how='left'
+            # Columns are renamed on the small lookup tables, not the merged frame
+            merged = merged.join(
+                tables['drivers'][['full_name', 'nationality', 'code']]
+                .rename(columns={'nationality': 'driver_nationality'}),
+                on='driverId'
             )
-            merged = merged.rename(columns={'nationality': 'driver_nationality'})
         
         # Merge with constructors
         if self.constructors is not None:
-            merged = merged.merge(
-                self.constructors[['constructorId', 'name', 'nationality']],
-                on='constructorId',
-                how='left'
+            merged = merged.join(
+                tables['constructors'][['name', 'nationality']].rename(columns={
+                    'name': 'constructor_name',
+                    'nationality': 'constructor_nationality'
+                }),
+                on='constructorId'
             )
-            merged = merged.rename(columns={
-                'name': 'constructor_name',
-                'nationality': 'constructor_nationality'
-            })
         
         # Merge with circuits
-        if self.circuits is not None and 'circuitId' in merged.columns:
-            merged = merged.merge(
-                self.circuits[['circuitId', 'name', 'country', 'lat', 'lng']],
-                on='circuitId',
-                how='left'
+        if self.circuits is not None:
+            merged = merged.join(
+                tables['circuits'][['name', 'country', 'lat', 'lng']].rename(columns={
+                    'name': 'circuit_name',
+                    'country': 'circuit_country'
+                }),
+                on='circuitId'
             )
-            merged = merged.rename(columns={
-                'name': 'circuit_name',
-                'country': 'circuit_country'
-            })
         
         # Merge with qualifying
         if self.qualifying is not None:
-            qual_agg = self.qualifying.groupby(['raceId', 'year', 'driverId']).agg({
-                'position': 'first',
-                'q1_seconds': 'first',
-                'q2_seconds': 'first',
-                'q3_seconds': 'first'
-            }).reset_index()
-            qual_agg = qual_agg.rename(columns={'position': 'qualifying_position'})
+            # One qualifying row per driver and race; the first entry wins
+            qualifying = tables['qualifying'].assign(_race_key=_race_key(self.qualifying))
+            qual_agg = qualifying.drop_duplicates(subset=['_race_key', 'driverId'], keep='first')[
+                ['_race_key', 'driverId', 'position', 'q1_seconds', 'q2_seconds', 'q3_seconds']
+            ].rename(columns={'position': 'qualifying_position'})
             
             merged = merged.merge(
                 qual_agg,
-                on=['raceId', 'year', 'driverId'],
-                how='left'
+                on=['_race_key', 'driverId'],
+                how='left',
+                validate='many_to_one'
             )
         
+        merged = merged.drop(columns='_race_key')
         print(f"Merged dataset shape: {merged.shape}")
         return merged
     
-    def create_aggregated_tables(self):
-        """Create pre-aggregated tables for faster analysis"""
-        print("Creating aggregated tables...")
-        
-        # Driver statistics
-        driver_stats = self.results.groupby('driverId').agg({
-            'position': ['count', lambda x: (x == 1).sum(), lambda x: (x <= 3).sum()],
-            'points': 'sum',
-            'is_dnf': 'sum',
-            'position_change': 'mean'
-        }).reset_index()
-        driver_stats.columns = ['driverId', 'races', 'wins', 'podiums', 'total_points', 'dnfs', 'avg_position_change']
+    def _pair_stats(self):
+        """Per driver/constructor pair totals, from one pass over results;
+        the career tables are rolled up from this instead of rescanning results"""
+        return self.results.groupby(
+            ['driverId', 'constructorId'], observed=True, sort=False, dropna=False
+        ).agg(
+            races=('position', 'count'),
+            wins=('is_win', 'sum'),
+            podiums=('is_podium', 'sum'),
+            total_points=('points', 'sum'),
+            dnfs=('is_dnf', 'sum'),
+            position_change_sum=('position_change', 'sum'),
+            position_change_count=('position_change', 'count')
+        ).reset_index()
+    
+    def create_driver_stats(self, pair_stats=None):
+        """Aggregate career statistics per driver"""
+        if pair_stats is None:
+            pair_stats = self._pair_stats()
+        driver_stats = pair_stats.drop(columns='constructorId').groupby(
+            'driverId', observed=True
+        ).sum().reset_index()
+        driver_stats['avg_position_change'] = (
+            driver_stats['position_change_sum'] / driver_stats['position_change_count']
+        )
+        driver_stats = driver_stats.drop(columns=['position_change_sum', 'position_change_count'])
         driver_stats = driver_stats.merge(
             self.drivers[['driverId', 'full_name']],
             on='driverId',
@@ -293,13 +390,15 @@ class F1DataCleaner:
         driver_stats['podium_rate'] = driver_stats['podiums'] / driver_stats['races']
         driver_stats['dnf_rate'] = driver_stats['dnfs'] / driver_stats['races']
         
-        # Constructor statistics
-        constructor_stats = self.results.groupby('constructorId').agg({
-            'position': ['count', lambda x: (x == 1).sum(), lambda x: (x <= 3).sum()],
-            'points': 'sum',
-            'is_dnf': 'sum'
-        }).reset_index()
-        constructor_stats.columns = ['constructorId', 'races', 'wins', 'podiums', 'total_points', 'dnfs']
+        return driver_stats
+    
+    def create_constructor_stats(self, pair_stats=None):
+        """Aggregate career statistics per constructor"""
+        if pair_stats is None:
+            pair_stats = self._pair_stats()
+        constructor_stats = pair_stats.groupby('constructorId', observed=True)[
+            ['races', 'wins', 'podiums', 'total_points', 'dnfs']
+        ].sum().reset_index()
         constructor_stats = constructor_stats.merge(
             self.constructors[['constructorId', 'name']],
             on='constructorId',
@@ -308,13 +407,50 @@ class F1DataCleaner:
         constructor_stats['win_rate'] = constructor_stats['wins'] / constructor_stats['races']
         constructor_stats['podium_rate'] = constructor_stats['podiums'] / constructor_stats['races']
         
+        return constructor_stats
+    
+    def create_aggregated_tables(self):
+        """Create pre-aggregated tables for faster analysis"""
+        print("Creating aggregated tables...")
+        
+        pair_stats = self._pair_stats()
         return {
-            'driver_stats': driver_stats,
-            'constructor_stats': constructor_stats
+            'driver_stats': self.create_driver_stats(pair_stats),
+            'constructor_stats': self.create_constructor_stats(pair_stats)
         }
     
-    def clean_all(self):
-        """Run all cleaning steps"""
+    def _inputs_fingerprint(self):
+        """Hash of the input CSVs' modification times, plus this module's so code edits invalidate it"""
+        stamps = sorted((p.name, p.stat().st_mtime_ns) for p in self.data_dir.glob('*.csv'))
+        stamps.append(('data_cleaner.py', Path(__file__).stat().st_mtime_ns))
+        return hashlib.sha1(repr(stamps).encode()).hexdigest()
+    
+    def clean_all(self, force=False):
+        """Run all cleaning steps, or reload the saved outputs if no input has changed"""
+        outputs = {
+            name: self.data_dir / f"{name}.parquet"
+            for name in ['merged_results', 'driver_stats', 'constructor_stats']
+        }
+        # Cleaned per-table frames, for callers that read them off the cleaner
+        cache_dir = self.data_dir / "_cache"
+        tables = {
+            name: cache_dir / f"clean_{name}.parquet"
+            for name in CLEANED_TABLES if (self.data_dir / f"{name}.csv").exists()
+        }
+        key_path = cache_dir / "clean_all.key"
+        fingerprint = self._inputs_fingerprint()
+        if (not force and key_path.exists() and key_path.read_text() == fingerprint
+                and all(path.exists() for path in [*outputs.values(), *tables.values()])):
+            print("Inputs unchanged, loading cleaned data from Parquet...")
+            for name in CLEANED_TABLES:
+                setattr(self, name, pd.read_parquet(tables[name]) if name in tables else None)
+            merged = pd.read_parquet(outputs['merged_results'])
+            aggregated = {
+                'driver_stats': pd.read_parquet(outputs['driver_stats']),
+                'constructor_stats': pd.read_parquet(outputs['constructor_stats'])
+            }
+            return merged, aggregated
+        
         self.load_data()
         self.clean_races()
         self.clean_drivers()
@@ -323,18 +459,22 @@ class F1DataCleaner:
         self.clean_pitstops()
         self.clean_laptimes()
         
-        merged = self.merge_data()
+        # Career stats come from results alone, so build them before the wide merge
         aggregated = self.create_aggregated_tables()
+        merged = self.merge_data()
         
-        # Save cleaned data
-        merged.to_csv(self.data_dir / "merged_results.csv", index=False)
-        aggregated['driver_stats'].to_csv(self.data_dir / "driver_stats.csv", index=False)
-        aggregated['constructor_stats'].to_csv(self.data_dir / "constructor_stats.csv", index=False)
+        # Save cleaned data as Parquet so dtypes survive the round trip
+        merged.to_parquet(outputs['merged_results'], engine='pyarrow', compression='zstd', index=False)
+        aggregated['driver_stats'].to_parquet(outputs['driver_stats'], engine='pyarrow', compression='zstd', index=False)
+        aggregated['constructor_stats'].to_parquet(outputs['constructor_stats'], engine='pyarrow', compression='zstd', index=False)
+        cache_dir.mkdir(exist_ok=True)
+        for name, path in tables.items():
+            getattr(self, name).to_parquet(path, engine='pyarrow', compression='zstd')
+        key_path.write_text(fingerprint)
         
         print(f"\nCleaned data saved to {self.data_dir}/")
         return merged, aggregated
 
-
 if __name__ == "__main__":
     cleaner = F1DataCleaner()
     merged, aggregated = cleaner.clean_all()
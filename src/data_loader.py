@@ -8,26 +8,83 @@ import pandas as pd
 import time
 from pathlib import Path
 import json
+import csv
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 
 class F1DataLoader:
     """Load Formula 1 data from Ergast API"""
     
     BASE_URL = "http://ergast.com/api/f1"
+    MAX_WORKERS = 4  # Seasons fetched concurrently
+    REQUESTS_PER_SECOND = 4  # Ergast's burst limit, shared by all workers
     
     def __init__(self, data_dir="data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
+        self._local = threading.local()
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
+    
+    @property
+    def _session(self):
+        """Keep-alive HTTP session for the calling thread"""
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+    
+    def _wait_for_slot(self):
+        """Space request starts across all threads to honor the API rate limit"""
+        with self._rate_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + 1.0 / self.REQUESTS_PER_SECOND
+        time.sleep(start_at - now)
         
     def _make_request(self, endpoint, limit=1000, offset=0):
         """Make API request with rate limiting"""
         url = f"{self.BASE_URL}/{endpoint}.json?limit={limit}&offset={offset}"
+        self._wait_for_slot()
         print(f"Fetching: {url}")
-        response = requests.get(url)
+        response = self._session.get(url)
         response.raise_for_status()
-        time.sleep(0.5)  # Rate limiting
         return response.json()
     
+    def _map_years(self, fetch, years):
+        """Run fetch(year) for each season concurrently, yielding results in season order"""
+        with ThreadPoolExecutor(max_workers=self.MAX_WORKERS) as executor:
+            yield from executor.map(fetch, years)
+    
+    def _append_csv(self, path, records, write_header):
+        """Write a batch of records to a CSV file, starting the file if write_header"""
+        with open(path, "w" if write_header else "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(records[0].keys()), lineterminator="\n")
+            if write_header:
+                writer.writeheader()
+            writer.writerows(records)
+    
+    def _write_csv_batches(self, path, batches):
+        """Stream record batches to path through a temp file, replacing path only once every
+        batch has arrived; on failure the previous file is left untouched. Returns whether
+        any records were written."""
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        written = False
+        try:
+            for records in batches:
+                if records:
+                    self._append_csv(tmp_path, records, write_header=not written)
+                    written = True
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        
+        if written:
+            os.replace(tmp_path, path)
+        return written
+    
     def _get_all_pages(self, endpoint, limit=1000):
         """Fetch all pages of data"""
         all_data = []
@@ -53,27 +110,33 @@ class F1DataLoader:
         
         return all_data
     
+    def _fetch_races(self, year):
+        """Fetch one season's race calendar"""
+        endpoint = f"{year}/races"
+        data = self._make_request(endpoint)
+        mrd = data.get("MRData", {})
+        race_table = mrd.get("RaceTable", {})
+        race_list = race_table.get("Races", [])
+        
+        races = []
+        for race in race_list:
+            races.append({
+                "raceId": race.get("round"),
+                "year": year,
+                "round": race.get("round"),
+                "circuitId": race.get("Circuit", {}).get("circuitId"),
+                "name": race.get("raceName"),
+                "date": race.get("date"),
+                "time": race.get("time"),
+                "url": race.get("url")
+            })
+        return races
+    
     def load_races(self, start_year=1950, end_year=2024):
         """Load race data"""
         races = []
-        for year in range(start_year, end_year + 1):
-            endpoint = f"{year}/races"
-            data = self._make_request(endpoint)
-            mrd = data.get("MRData", {})
-            race_table = mrd.get("RaceTable", {})
-            race_list = race_table.get("Races", [])
-            
-            for race in race_list:
-                races.append({
-                    "raceId": race.get("round"),
-                    "year": year,
-                    "round": race.get("round"),
-                    "circuitId": race.get("Circuit", {}).get("circuitId"),
-                    "name": race.get("raceName"),
-                    "date": race.get("date"),
-                    "time": race.get("time"),
-                    "url": race.get("url")
-                })
+        for season in self._map_years(self._fetch_races, range(start_year, end_year + 1)):
+            races.extend(season)
         
         df = pd.DataFrame(races)
         df.to_csv(self.data_dir / "races.csv", index=False)
@@ -121,11 +184,69 @@ class F1DataLoader:
         df.to_csv(self.data_dir / "constructors.csv", index=False)
         return df
     
+    def _fetch_results(self, year):
+        """Fetch one season's race results"""
+        endpoint = f"{year}/results"
+        data = self._make_request(endpoint, limit=1000)
+        mrd = data.get("MRData", {})
+        race_table = mrd.get("RaceTable", {})
+        races = race_table.get("Races", [])
+            
+        results = []
+        for race in races:
+            race_id = race.get("round")
+            year_val = year
+            for result in race.get("Results", []):
+                results.append({
+                    "resultId": None,  # Numbered in season order by load_results
+                    "raceId": race_id,
+                    "year": year_val,
+                    "driverId": result.get("Driver", {}).get("driverId"),
+                    "constructorId": result.get("Constructor", {}).get("constructorId"),
+                    "number": result.get("number"),
+                    "grid": result.get("grid"),
+                    "position": result.get("position"),
+                    "positionText": result.get("positionText"),
+                    "positionOrder": result.get("positionOrder"),
+                    "points": result.get("points"),
+                    "laps": result.get("laps"),
+                    "time": result.get("Time", {}).get("time") if isinstance(result.get("Time"), dict) else result.get("Time"),
+                    "milliseconds": result.get("Time", {}).get("millis") if isinstance(result.get("Time"), dict) else None,
+                    "fastestLap": result.get("FastestLap", {}).get("lap") if isinstance(result.get("FastestLap"), dict) else None,
+                    "rank": result.get("FastestLap", {}).get("rank") if isinstance(result.get("FastestLap"), dict) else None,
+                    "fastestLapTime": result.get("FastestLap", {}).get("Time", {}).get("time") if isinstance(result.get("FastestLap"), dict) else None,
+                    "fastestLapSpeed": result.get("FastestLap", {}).get("AverageSpeed", {}).get("speed") if isinstance(result.get("FastestLap"), dict) else None,
+                    "statusId": result.get("status"),
+                    "status": result.get("status")
+                })
+        return results
+    
     def load_results(self, start_year=1950, end_year=2024):
         """Load race results"""
-        results = []
-        for year in range(start_year, end_year + 1):
-            endpoint = f"{year}/results"
+        # Each season is flushed to disk so only one season is buffered at a time
+        path = self.data_dir / "results.csv"
+        
+        def numbered(seasons):
+            result_id = 0
+            for results in seasons:
+                for result in results:
+                    result_id += 1
+                    result["resultId"] = result_id
+                yield results
+        
+        seasons = self._map_years(self._fetch_results, range(start_year, end_year + 1))
+        if self._write_csv_batches(path, numbered(seasons)):
+            return pd.read_csv(path)
+        
+        df = pd.DataFrame()
+        df.to_csv(path, index=False)
+        return df
+    
+    def _fetch_qualifying(self, year):
+        """Fetch one season's qualifying results"""
+        qualifying = []
+        endpoint = f"{year}/qualifying"
+        try:
             data = self._make_request(endpoint, limit=1000)
             mrd = data.get("MRData", {})
             race_table = mrd.get("RaceTable", {})
@@ -134,64 +255,31 @@ class F1DataLoader:
             for race in races:
                 race_id = race.get("round")
                 year_val = year
-                for result in race.get("Results", []):
-                    results.append({
-                        "resultId": len(results) + 1,
+                for qual in race.get("QualifyingResults", []):
+                    qualifying.append({
+                        "qualifyId": None,  # Numbered in season order by load_qualifying
                         "raceId": race_id,
                         "year": year_val,
-                        "driverId": result.get("Driver", {}).get("driverId"),
-                        "constructorId": result.get("Constructor", {}).get("constructorId"),
-                        "number": result.get("number"),
-                        "grid": result.get("grid"),
-                        "position": result.get("position"),
-                        "positionText": result.get("positionText"),
-                        "positionOrder": result.get("positionOrder"),
-                        "points": result.get("points"),
-                        "laps": result.get("laps"),
-                        "time": result.get("Time", {}).get("time") if isinstance(result.get("Time"), dict) else result.get("Time"),
-                        "milliseconds": result.get("Time", {}).get("millis") if isinstance(result.get("Time"), dict) else None,
-                        "fastestLap": result.get("FastestLap", {}).get("lap") if isinstance(result.get("FastestLap"), dict) else None,
-                        "rank": result.get("FastestLap", {}).get("rank") if isinstance(result.get("FastestLap"), dict) else None,
-                        "fastestLapTime": result.get("FastestLap", {}).get("Time", {}).get("time") if isinstance(result.get("FastestLap"), dict) else None,
-                        "fastestLapSpeed": result.get("FastestLap", {}).get("AverageSpeed", {}).get("speed") if isinstance(result.get("FastestLap"), dict) else None,
-                        "statusId": result.get("status"),
-                        "status": result.get("status")
+                        "driverId": qual.get("Driver", {}).get("driverId"),
+                        "constructorId": qual.get("Constructor", {}).get("constructorId"),
+                        "number": qual.get("number"),
+                        "position": qual.get("position"),
+                        "q1": qual.get("Q1"),
+                        "q2": qual.get("Q2"),
+                        "q3": qual.get("Q3")
                     })
-        
-        df = pd.DataFrame(results)
-        df.to_csv(self.data_dir / "results.csv", index=False)
-        return df
+        except Exception as e:
+            print(f"Error loading qualifying for {year}: {e}")
+            return []
+        return qualifying
     
     def load_qualifying(self, start_year=2003, end_year=2024):
         """Load qualifying results (available from 2003)"""
         qualifying = []
-        for year in range(start_year, end_year + 1):
-            endpoint = f"{year}/qualifying"
-            try:
-                data = self._make_request(endpoint, limit=1000)
-                mrd = data.get("MRData", {})
-                race_table = mrd.get("RaceTable", {})
-                races = race_table.get("Races", [])
-                
-                for race in races:
-                    race_id = race.get("round")
-                    year_val = year
-                    for qual in race.get("QualifyingResults", []):
-                        qualifying.append({
-                            "qualifyId": len(qualifying) + 1,
-                            "raceId": race_id,
-                            "year": year_val,
-                            "driverId": qual.get("Driver", {}).get("driverId"),
-                            "constructorId": qual.get("Constructor", {}).get("constructorId"),
-                            "number": qual.get("number"),
-                            "position": qual.get("position"),
-                            "q1": qual.get("Q1"),
-                            "q2": qual.get("Q2"),
-                            "q3": qual.get("Q3")
-                        })
-            except Exception as e:
-                print(f"Error loading qualifying for {year}: {e}")
-                continue
+        for season in self._map_years(self._fetch_qualifying, range(start_year, end_year + 1)):
+            for qual in season:
+                qual["qualifyId"] = len(qualifying) + 1
+                qualifying.append(qual)
         
         df = pd.DataFrame(qualifying)
         if not df.empty:
@@ -222,85 +310,95 @@ class F1DataLoader:
         df.to_csv(self.data_dir / "circuits.csv", index=False)
         return df
     
+    def _fetch_pitstops(self, year):
+        """Fetch one season's pit stops"""
+        pitstops = []
+        endpoint = f"{year}/pitstops"
+        try:
+            data = self._make_request(endpoint, limit=1000)
+            mrd = data.get("MRData", {})
+            race_table = mrd.get("RaceTable", {})
+            races = race_table.get("Races", [])
+            
+            for race in races:
+                race_id = race.get("round")
+                year_val = year
+                for stop in race.get("PitStops", []):
+                    pitstops.append({
+                        "raceId": race_id,
+                        "year": year_val,
+                        "driverId": stop.get("driverId"),
+                        "stop": stop.get("stop"),
+                        "lap": stop.get("lap"),
+                        "time": stop.get("time"),
+                        "duration": stop.get("duration")
+                    })
+        except Exception as e:
+            print(f"Error loading pitstops for {year}: {e}")
+            return []
+        return pitstops
+    
     def load_pitstops(self, start_year=2011, end_year=2024):
         """Load pit stop data (available from 2011)"""
         pitstops = []
-        for year in range(start_year, end_year + 1):
-            endpoint = f"{year}/pitstops"
-            try:
-                data = self._make_request(endpoint, limit=1000)
-                mrd = data.get("MRData", {})
-                race_table = mrd.get("RaceTable", {})
-                races = race_table.get("Races", [])
-                
-                for race in races:
-                    race_id = race.get("round")
-                    year_val = year
-                    for stop in race.get("PitStops", []):
-                        pitstops.append({
-                            "raceId": race_id,
-                            "year": year_val,
-                            "driverId": stop.get("driverId"),
-                            "stop": stop.get("stop"),
-                            "lap": stop.get("lap"),
-                            "time": stop.get("time"),
-                            "duration": stop.get("duration")
-                        })
-            except Exception as e:
-                print(f"Error loading pitstops for {year}: {e}")
-                continue
+        for season in self._map_years(self._fetch_pitstops, range(start_year, end_year + 1)):
+            pitstops.extend(season)
         
         df = pd.DataFrame(pitstops)
         if not df.empty:
             df.to_csv(self.data_dir / "pitstops.csv", index=False)
         return df
     
+    def _fetch_laptimes(self, year, limit_races):
+        """Fetch one season's lap times, as one list of laps per race"""
+        race_batches = []
+        try:
+            # Get races for the year first
+            races_data = self._make_request(f"{year}/races")
+            races_list = races_data.get("MRData", {}).get("RaceTable", {}).get("Races", [])
+            
+            # Limit number of races
+            for race in races_list[:limit_races]:
+                race_id = race.get("round")
+                round_num = race.get("round")
+                
+                # Get laps for this race
+                lap_endpoint = f"{year}/{round_num}/laps"
+                try:
+                    lap_data = self._make_request(lap_endpoint, limit=1000)
+                    mrd = lap_data.get("MRData", {})
+                    race_table = mrd.get("RaceTable", {})
+                    races = race_table.get("Races", [])
+                    
+                    laptimes = []
+                    for race_info in races:
+                        for lap_num, drivers in race_info.get("Laps", {}).items():
+                            for driver_lap in drivers:
+                                laptimes.append({
+                                    "raceId": race_id,
+                                    "year": year,
+                                    "driverId": driver_lap.get("driverId"),
+                                    "lap": lap_num,
+                                    "position": driver_lap.get("position"),
+                                    "time": driver_lap.get("time")
+                                })
+                    race_batches.append(laptimes)
+                except Exception as e:
+                    print(f"Error loading laptimes for {year} race {race_id}: {e}")
+                    continue
+        except Exception as e:
+            print(f"Error loading laptimes for {year}: {e}")
+        return race_batches
+    
     def load_laptimes(self, start_year=2011, end_year=2024, limit_races=50):
         """Load lap time data (limited to recent races due to API constraints)"""
-        laptimes = []
+        # Each race is flushed to disk as soon as its season arrives
+        path = self.data_dir / "laptimes.csv"
         # Limit to most recent races to avoid overwhelming the API
-        for year in range(max(2011, start_year), end_year + 1):
-            endpoint = f"{year}/laps"
-            try:
-                # Get races for the year first
-                races_data = self._make_request(f"{year}/races")
-                races_list = races_data.get("MRData", {}).get("RaceTable", {}).get("Races", [])
-                
-                # Limit number of races
-                for race in races_list[:limit_races]:
-                    race_id = race.get("round")
-                    round_num = race.get("round")
-                    
-                    # Get laps for this race
-                    lap_endpoint = f"{year}/{round_num}/laps"
-                    try:
-                        lap_data = self._make_request(lap_endpoint, limit=1000)
-                        mrd = lap_data.get("MRData", {})
-                        race_table = mrd.get("RaceTable", {})
-                        races = race_table.get("Races", [])
-                        
-                        for race_info in races:
-                            for lap_num, drivers in race_info.get("Laps", {}).items():
-                                for driver_lap in drivers:
-                                    laptimes.append({
-                                        "raceId": race_id,
-                                        "year": year,
-                                        "driverId": driver_lap.get("driverId"),
-                                        "lap": lap_num,
-                                        "position": driver_lap.get("position"),
-                                        "time": driver_lap.get("time")
-                                    })
-                    except Exception as e:
-                        print(f"Error loading laptimes for {year} race {race_id}: {e}")
-                        continue
-            except Exception as e:
-                print(f"Error loading laptimes for {year}: {e}")
-                continue
-        
-        df = pd.DataFrame(laptimes)
-        if not df.empty:
-            df.to_csv(self.data_dir / "laptimes.csv", index=False)
-        return df
+        years = range(max(2011, start_year), end_year + 1)
+        fetch = partial(self._fetch_laptimes, limit_races=limit_races)
+        races = (laptimes for race_batches in self._map_years(fetch, years) for laptimes in race_batches)
+        return pd.read_csv(path) if self._write_csv_batches(path, races) else pd.DataFrame()
     
     def load_all(self, start_year=1950, end_year=2024):
         """Load all available data"""
@@ -3,6 +3,7 @@ Driver Comparison Tool
 Compare two drivers across multiple metrics
 """
 
+import functools
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -10,6 +11,24 @@ import seaborn as sns
 from pathlib import Path
 
 
+# Career stats compared straight from driver_stats, with how each is reported
+CAREER_METRICS = [
+    ('wins', int),
+    ('podiums', int),
+    ('total_points', int),
+    ('races', int),
+    ('win_rate', lambda rate: rate * 100),
+    ('podium_rate', lambda rate: rate * 100),
+    ('dnf_rate', lambda rate: rate * 100)
+]
+
+
+def _skipna(func, values):
+    """Apply a numpy reduction to the non-missing values, NaN if there are none"""
+    values = values[~np.isnan(values)]
+    return func(values) if values.size else values.dtype.type(np.nan)
+
+
 class DriverComparison:
     """Compare F1 drivers across multiple metrics"""
     
@@ -17,21 +36,54 @@ class DriverComparison:
         self.merged_df = merged_df
         self.driver_stats = driver_stats
         self.cleaner = cleaner
+        
+        # Index once so each comparison is a few lookups rather than full-table scans
+        # (the first row wins when two drivers share a name)
+        self._stats_by_name = driver_stats.dropna(subset=['full_name']).drop_duplicates('full_name').set_index('full_name')
+        self._driver_groups = dict(tuple(merged_df.groupby('driverId', observed=True, sort=False)))
+        # driverId x year points; NaN where the driver didn't race that year
+        self._yearly_points = merged_df.groupby(['driverId', 'year'], observed=True)['points'].sum().unstack()
+        # Comparisons are cached per instance, keyed on the unordered name pair
+        self._compare_pair = functools.lru_cache(maxsize=256)(self._compare_pair_uncached)
+    
+    def _driver_id(self, driver_name):
+        """driverId for a driver's full name"""
+        return self._stats_by_name.at[driver_name, 'driverId']
+    
+    def _driver_history(self, driver_id):
+        """Race rows for one driver"""
+        history = self._driver_groups.get(driver_id)
+        return history if history is not None else self.merged_df.iloc[:0]
     
     def compare_drivers(self, driver1_name, driver2_name):
         """Compare two drivers"""
-        driver1_stats = self.driver_stats[self.driver_stats['full_name'] == driver1_name]
-        driver2_stats = self.driver_stats[self.driver_stats['full_name'] == driver2_name]
-        
-        if driver1_stats.empty or driver2_stats.empty:
+        # Validate before ordering: a missing name may be NaN, which can't be compared to a str
+        if driver1_name not in self._stats_by_name.index or driver2_name not in self._stats_by_name.index:
             raise ValueError("One or both drivers not found")
         
-        driver1_id = driver1_stats['driverId'].values[0]
-        driver2_id = driver2_stats['driverId'].values[0]
+        swap = driver2_name < driver1_name
+        comparison = self._compare_pair(*sorted((driver1_name, driver2_name)))
+        
+        # Fresh dicts every call, so callers can't modify the cached result
+        side1, side2 = ('driver2', 'driver1') if swap else ('driver1', 'driver2')
+        return {
+            'driver1': comparison[side1],
+            'driver2': comparison[side2],
+            'metrics': {
+                metric: {'driver1': values[side1], 'driver2': values[side2]}
+                for metric, values in comparison['metrics'].items()
+            },
+            'common_years': comparison['common_years']
+        }
+    
+    def _compare_pair_uncached(self, driver1_name, driver2_name):
+        """Build the comparison for one ordered pair of drivers"""
+        driver1_stats = self._stats_by_name.loc[driver1_name].to_dict()
+        driver2_stats = self._stats_by_name.loc[driver2_name].to_dict()
         
         # Get race history
-        driver1_history = self.merged_df[self.merged_df['driverId'] == driver1_id]
-        driver2_history = self.merged_df[self.merged_df['driverId'] == driver2_id]
+        driver1_history = self._driver_history(driver1_stats['driverId'])
+        driver2_history = self._driver_history(driver2_stats['driverId'])
         
         # Calculate comparison metrics
         comparison = {
@@ -40,63 +92,30 @@ class DriverComparison:
             'metrics': {}
         }
         
-        # Basic stats
-        comparison['metrics']['wins'] = {
-            'driver1': int(driver1_stats['wins'].values[0]),
-            'driver2': int(driver2_stats['wins'].values[0])
-        }
-        
-        comparison['metrics']['podiums'] = {
-            'driver1': int(driver1_stats['podiums'].values[0]),
-            'driver2': int(driver2_stats['podiums'].values[0])
-        }
-        
-        comparison['metrics']['total_points'] = {
-            'driver1': int(driver1_stats['total_points'].values[0]),
-            'driver2': int(driver2_stats['total_points'].values[0])
-        }
-        
-        comparison['metrics']['races'] = {
-            'driver1': int(driver1_stats['races'].values[0]),
-            'driver2': int(driver2_stats['races'].values[0])
-        }
-        
-        comparison['metrics']['win_rate'] = {
-            'driver1': driver1_stats['win_rate'].values[0] * 100,
-            'driver2': driver2_stats['win_rate'].values[0] * 100
-        }
-        
-        comparison['metrics']['podium_rate'] = {
-            'driver1': driver1_stats['podium_rate'].values[0] * 100,
-            'driver2': driver2_stats['podium_rate'].values[0] * 100
-        }
-        
-        comparison['metrics']['dnf_rate'] = {
-            'driver1': driver1_stats['dnf_rate'].values[0] * 100,
-            'driver2': driver2_stats['dnf_rate'].values[0] * 100
-        }
-        
-        # Average position
-        comparison['metrics']['avg_position'] = {
-            'driver1': driver1_history['position'].mean(),
-            'driver2': driver2_history['position'].mean()
-        }
-        
-        # Best position
-        comparison['metrics']['best_position'] = {
-            'driver1': driver1_history['position'].min(),
-            'driver2': driver2_history['position'].min()
-        }
-        
-        # Position change (overtaking)
-        comparison['metrics']['avg_position_change'] = {
-            'driver1': driver1_history['position_change'].mean(),
-            'driver2': driver2_history['position_change'].mean()
-        }
+        # Basic stats: counts as ints, rates as percentages
+        comparison['metrics'].update({
+            metric: {'driver1': convert(driver1_stats[metric]), 'driver2': convert(driver2_stats[metric])}
+            for metric, convert in CAREER_METRICS
+        })
+        
+        # Average / best position and position change (overtaking) from race history
+        positions = (driver1_history['position'].to_numpy(), driver2_history['position'].to_numpy())
+        changes = (driver1_history['position_change'].to_numpy(), driver2_history['position_change'].to_numpy())
+        for metric, values, func in [
+            ('avg_position', positions, np.mean),
+            ('best_position', positions, np.min),
+            ('avg_position_change', changes, np.mean)
+        ]:
+            comparison['metrics'][metric] = {
+                'driver1': _skipna(func, values[0]),
+                'driver2': _skipna(func, values[1])
+            }
         
         # Common races (if they raced in same period)
-        common_years = set(driver1_history['year'].unique()) & set(driver2_history['year'].unique())
-        comparison['common_years'] = len(common_years)
+        common_years = np.intersect1d(
+            driver1_history['year'].unique(), driver2_history['year'].unique(), assume_unique=True
+        )
+        comparison['common_years'] = common_years.size
         
         return comparison
     
@@ -122,17 +141,16 @@ class DriverComparison:
         
         # Performance over time (if common years exist)
         if comparison['common_years'] > 0:
-            driver1_id = self.driver_stats[self.driver_stats['full_name'] == comparison['driver1']]['driverId'].values[0]
-            driver2_id = self.driver_stats[self.driver_stats['full_name'] == comparison['driver2']]['driverId'].values[0]
-            
-            driver1_yearly = self.merged_df[self.merged_df['driverId'] == driver1_id].groupby('year')['points'].sum()
-            driver2_yearly = self.merged_df[self.merged_df['driverId'] == driver2_id].groupby('year')['points'].sum()
+            driver1_id = self._driver_id(comparison['driver1'])
+            driver2_id = self._driver_id(comparison['driver2'])
             
-            common_years = sorted(set(driver1_yearly.index) & set(driver2_yearly.index))
+            yearly = self._yearly_points.loc[[driver1_id, driver2_id]].to_numpy()
+            common = ~np.isnan(yearly).any(axis=0)
+            common_years = self._yearly_points.columns[common]
             
-            axes[5].plot(common_years, [driver1_yearly[y] for y in common_years], 
+            axes[5].plot(common_years, yearly[0, common], 
                         marker='o', label=comparison['driver1'], linewidth=2, color='#E10600')
-            axes[5].plot(common_years, [driver2_yearly[y] for y in common_years], 
+            axes[5].plot(common_years, yearly[1, common], 
                         marker='s', label=comparison['driver2'], linewidth=2, color='#1E41FF')
             axes[5].set_title('Points Over Common Years', fontweight='bold')
             axes[5].set_xlabel('Year')
@@ -156,18 +174,15 @@ class DriverComparison:
         print(f"DRIVER COMPARISON: {comparison['driver1']} vs {comparison['driver2']}")
         print("=" * 80)
         
-        for metric, values in comparison['metrics'].items():
-            driver1_val = values['driver1']
-            driver2_val = values['driver2']
-            
-            # Format based on metric type
-            if isinstance(driver1_val, float):
-                if 'rate' in metric:
-                    print(f"{metric.replace('_', ' ').title():25s} {driver1_val:>8.2f}%  vs  {driver2_val:>8.2f}%")
-                else:
-                    print(f"{metric.replace('_', ' ').title():25s} {driver1_val:>8.2f}  vs  {driver2_val:>8.2f}")
-            else:
-                print(f"{metric.replace('_', ' ').title():25s} {driver1_val:>8}  vs  {driver2_val:>8}")
+        # One table render instead of a print per metric; counts stay ints, floats get 2 decimals
+        metrics = comparison['metrics']
+        table = pd.DataFrame(
+            [[values['driver1'], values['driver2']] for values in metrics.values()],
+            index=[metric.replace('_', ' ').title() + (' (%)' if 'rate' in metric else '') for metric in metrics],
+            columns=[comparison['driver1'], comparison['driver2']],
+            dtype=object
+        )
+        print(table.to_string(float_format='{:.2f}'.format))
         
         print(f"\nCommon Racing Years: {comparison['common_years']}")
         print("=" * 80)
@@ -179,10 +194,7 @@ if __name__ == "__main__":
     # Load data
     data_dir = Path("../data")
     cleaner = F1DataCleaner(data_dir=data_dir)
-    cleaner.load_data()
-    cleaner.clean_all()
-    merged_df = cleaner.merge_data()
-    aggregated = cleaner.create_aggregated_tables()
+    merged_df, aggregated = cleaner.clean_all()
     
     # Compare drivers
     comparator = DriverComparison(merged_df, aggregated['driver_stats'], cleaner)
@@ -3,16 +3,33 @@ Formula 1 Race Result Prediction Model
 Uses machine learning to predict race outcomes
 """
 
+import hashlib
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
+from sklearn import config_context
+from sklearn.ensemble import HistGradientBoostingRegressor
+from sklearn.inspection import permutation_importance
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, accuracy_score, classification_report
 import joblib
+from joblib import Parallel, delayed
 from pathlib import Path
 
 
+def _frames_digest(*frames):
+    """Content hash of the given frames (None allowed), for on-disk memoization;
+    this module's mtime is mixed in so edits to the feature code invalidate it"""
+    digest = hashlib.md5(str(Path(__file__).stat().st_mtime_ns).encode())
+    for df in frames:
+        if df is None:
+            digest.update(b'None')
+            continue
+        digest.update(str((df.shape, df.columns.tolist())).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
 class F1PredictionModel:
     """Predict F1 race results using historical data"""
     
@@ -20,41 +37,54 @@ class F1PredictionModel:
         self.position_model = None
         self.points_model = None
         self.scaler = StandardScaler()
+        self.feature_cols_ = None  # Feature columns the models were fitted on, in order
+        
+    def prepare_features(self, merged_df, qualifying_df=None, cache_dir=None):
+        """Prepare features for prediction (memoized under cache_dir when given)"""
+        if cache_dir is not None:
+            cache_path = Path(cache_dir) / f"features_{_frames_digest(merged_df, qualifying_df)}.pkl"
+            if cache_path.exists():
+                return joblib.load(cache_path)
+        
+        # Categorical keys let the groupbys below aggregate on integer codes
+        # (the cleaner's merged frame already has them)
+        merged_df = merged_df.assign(**{
+            col: merged_df[col].astype('category')
+            for col in ['driverId', 'constructorId', 'circuitId']
+            if col in merged_df.columns and not isinstance(merged_df[col].dtype, pd.CategoricalDtype)
+        })
+        
+        # Derived columns are collected here and attached in one assign at the
+        # end, so merged_df itself is never copied
+        new_cols = {}
+        
+        # The three aggregations are independent, so they run on a small thread
+        # pool (pandas' groupby kernels release the GIL)
+        tasks = [(self._driver_aggregates, 'driverId'), (self._constructor_aggregates, 'constructorId')]
+        if 'circuitId' in merged_df.columns:
+            tasks.append((self._circuit_aggregates, 'circuitId'))
+        
+        lookups = zip(
+            Parallel(n_jobs=len(tasks), backend='threading')(delayed(func)(merged_df) for func, _ in tasks),
+            [key for _, key in tasks]
+        )
+        
+        # Each row picks up its driver / constructor / circuit aggregates by key
+        for stats, key in lookups:
+            rows = stats.reindex(merged_df[key])
+            new_cols.update({col: rows[col].to_numpy() for col in stats.columns})
         
-    def prepare_features(self, merged_df, qualifying_df=None):
-        """Prepare features for prediction"""
-        # Create features from historical data
-        features_df = merged_df.copy()
-        
-        # Driver historical stats
-        driver_stats = features_df.groupby('driverId').agg({
-            'position': ['mean', 'std', 'min'],
-            'points': 'mean',
-            'wins': lambda x: (x == 1).sum() if 'wins' in features_df.columns else 0
-        }).reset_index()
-        driver_stats.columns = ['driverId', 'driver_avg_position', 'driver_position_std', 'driver_best_position', 'driver_avg_points', 'driver_wins']
-        
-        features_df = features_df.merge(driver_stats, on='driverId', how='left')
-        
-        # Constructor historical stats
-        constructor_stats = features_df.groupby('constructorId').agg({
-            'position': ['mean', 'std'],
-            'points': 'mean'
-        }).reset_index()
-        constructor_stats.columns = ['constructorId', 'constructor_avg_position', 'constructor_position_std', 'constructor_avg_points']
-        
-        features_df = features_df.merge(constructor_stats, on='constructorId', how='left')
+        # Year/season features
+        year = merged_df['year'].to_numpy()
+        lo, hi = year.min(), year.max()
+        with np.errstate(divide='ignore', invalid='ignore'):  # A single season normalizes to NaN, as before
+            new_cols['year_normalized'] = (year - lo) * (1.0 / (hi - lo))
         
-        # Circuit stats
-        if 'circuitId' in features_df.columns:
-            circuit_stats = features_df.groupby('circuitId').agg({
-                'position': 'mean'
-            }).reset_index()
-            circuit_stats.columns = ['circuitId', 'circuit_avg_position']
-            features_df = features_df.merge(circuit_stats, on='circuitId', how='left')
+        # Grid position
+        if 'grid' in merged_df.columns:
+            new_cols['grid_normalized'] = merged_df['grid'] / 20.0  # Normalize to 0-1
         
-        # Year/season features
-        features_df['year_normalized'] = (features_df['year'] - features_df['year'].min()) / (features_df['year'].max() - features_df['year'].min())
+        features_df = merged_df.assign(**new_cols)
         
         # Qualifying position (if available)
         if qualifying_df is not None:
@@ -64,15 +94,40 @@ class F1PredictionModel:
                 how='left'
             )
         
-        # Grid position
-        if 'grid' in features_df.columns:
-            features_df['grid_normalized'] = features_df['grid'] / 20.0  # Normalize to 0-1
+        if cache_dir is not None:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            joblib.dump(features_df, cache_path, compress=3)
         
         return features_df
     
-    def train_position_model(self, features_df, target_col='position'):
-        """Train model to predict final position"""
-        # Prepare data
+    def _driver_aggregates(self, merged_df):
+        """Driver historical stats; wins are a boolean column summed in the same grouped pass"""
+        driver_stats = merged_df[['driverId', 'position', 'points']].assign(
+            win=merged_df['position'].to_numpy() == 1
+        ).groupby('driverId', observed=True).agg({
+            'position': ['mean', 'std', 'min'],
+            'points': 'mean',
+            'win': 'sum'
+        })
+        driver_stats.columns = ['driver_avg_position', 'driver_position_std', 'driver_best_position', 'driver_avg_points', 'driver_wins']
+        return driver_stats
+    
+    def _constructor_aggregates(self, merged_df):
+        """Constructor historical stats"""
+        constructor_stats = merged_df.groupby('constructorId', observed=True).agg({
+            'position': ['mean', 'std'],
+            'points': 'mean'
+        })
+        constructor_stats.columns = ['constructor_avg_position', 'constructor_position_std', 'constructor_avg_points']
+        return constructor_stats
+    
+    def _circuit_aggregates(self, merged_df):
+        """Circuit stats"""
+        circuit_stats = merged_df.groupby('circuitId', observed=True)['position'].mean()
+        return circuit_stats.to_frame('circuit_avg_position')
+    
+    def _select_features(self, features_df):
+        """Feature columns present in features_df, in model input order"""
         feature_cols = [
             'driver_avg_position', 'driver_position_std', 'driver_best_position',
             'driver_avg_points', 'driver_wins',
@@ -86,105 +141,130 @@ class F1PredictionModel:
             feature_cols.append('qualifying_position')
         
         # Filter available features
-        available_features = [col for col in feature_cols if col in features_df.columns]
-        
-        X = features_df[available_features].fillna(0)
-        y = features_df[target_col].fillna(20)  # Default to last position if missing
-        
-        # Remove infinite values
-        X = X.replace([np.inf, -np.inf], 0)
-        
-        # Split data
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        # Train model
-        self.position_model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
-        self.position_model.fit(X_train, y_train)
-        
-        # Evaluate
-        y_pred = self.position_model.predict(X_test)
-        mae = mean_absolute_error(y_test, y_pred)
+        return [col for col in feature_cols if col in features_df.columns]
+    
+    def _feature_matrix(self, features_df, feature_cols):
+        """Model input: float32 (half the bytes the trees read), C-contiguous (no copy inside
+        sklearn), with NaN and +/-inf zeroed in a single pass"""
+        # Copies only when to_numpy handed back a read-only or Fortran-ordered view
+        X = np.require(features_df[feature_cols].to_numpy(dtype=np.float32), requirements=['C', 'W'])
+        return np.nan_to_num(X, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+    
+    def _training_split(self, features_df, target_col='position'):
+        """Build the feature matrix once and split it together with both targets"""
+        self.feature_cols_ = self._select_features(features_df)
+        
+        X = self._feature_matrix(features_df, self.feature_cols_)
+        y_position = features_df[target_col].fillna(20).astype('float32')  # Default to last position if missing
+        y_points = features_df['points'].fillna(0).astype('float32')
+        
+        # One split shared by both models (same rows as two splits with the same seed)
+        X_train, X_test, y_position_train, y_position_test, y_points_train, y_points_test = train_test_split(
+            X, y_position, y_points, test_size=0.2, random_state=42
+        )
+        return {
+            'features': self.feature_cols_,
+            'X_train': X_train,
+            'X_test': X_test,
+            'position': (y_position_train, y_position_test),
+            'points': (y_points_train, y_points_test)
+        }
+    
+    def _fit_position_model(self, split):
+        """Fit and evaluate the position model on a prepared split"""
+        X_train, X_test = split['X_train'], split['X_test']
+        y_train, y_test = split['position']
+        
+        # Train model; _feature_matrix already zeroed NaN/inf, so sklearn can skip its finiteness scans
+        self.position_model = HistGradientBoostingRegressor(max_iter=200, max_bins=255, early_stopping=True, random_state=42)
+        with config_context(assume_finite=True):
+            self.position_model.fit(X_train, y_train)
+            
+            # Evaluate
+            y_pred = self.position_model.predict(X_test)
+            mae = mean_absolute_error(y_test, y_pred)
+            
+            # Histogram boosting has no impurity importances; measure on the held-out split instead
+            importances = permutation_importance(
+                self.position_model, X_test, y_test, n_repeats=5, random_state=42, n_jobs=-1
+            ).importances_mean
         
         print(f"Position Prediction Model - MAE: {mae:.2f}")
         print(f"Feature importance:")
-        for feature, importance in zip(available_features, self.position_model.feature_importances_):
-            print(f"  {feature}: {importance:.4f}")
+        print("\n".join(f"  {feature}: {importance:.4f}" for feature, importance in zip(split['features'], importances)))
         
         return mae
     
-    def train_points_model(self, features_df):
-        """Train model to predict points"""
-        # Prepare data
-        feature_cols = [
-            'driver_avg_position', 'driver_position_std', 'driver_best_position',
-            'driver_avg_points', 'driver_wins',
-            'constructor_avg_position', 'constructor_position_std', 'constructor_avg_points',
-            'year_normalized', 'grid_normalized'
-        ]
-        
-        if 'circuit_avg_position' in features_df.columns:
-            feature_cols.append('circuit_avg_position')
-        if 'qualifying_position' in features_df.columns:
-            feature_cols.append('qualifying_position')
-        
-        available_features = [col for col in feature_cols if col in features_df.columns]
+    def _fit_points_model(self, split):
+        """Fit and evaluate the points model on a prepared split"""
+        X_train, X_test = split['X_train'], split['X_test']
+        y_train, y_test = split['points']
+        
+        self.points_model = HistGradientBoostingRegressor(max_iter=200, max_bins=255, early_stopping=True, random_state=42)
+        with config_context(assume_finite=True):
+            self.points_model.fit(X_train, y_train)
+            
+            y_pred = self.points_model.predict(X_test)
+            mae = mean_absolute_error(y_test, y_pred)
         
-        X = features_df[available_features].fillna(0)
-        y = features_df['points'].fillna(0)
-        
-        X = X.replace([np.inf, -np.inf], 0)
-        
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+        print(f"Points Prediction Model - MAE: {mae:.2f}")
         
-        self.points_model = RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=-1)
-        self.points_model.fit(X_train, y_train)
+        return mae
+    
+    def train_position_model(self, features_df, target_col='position'):
+        """Train model to predict final position"""
+        return self._fit_position_model(self._training_split(features_df, target_col))
+    
+    def train_points_model(self, features_df):
+        """Train model to predict points"""
+        return self._fit_points_model(self._training_split(features_df))
+    
+    def train_all(self, features_df):
+        """Train both models from one shared feature matrix and train/test split"""
+        split = self._training_split(features_df)
         
-        y_pred = self.points_model.predict(X_test)
-        mae = mean_absolute_error(y_test, y_pred)
+        print("Training position prediction model...")
+        position_mae = self._fit_position_model(split)
         
-        print(f"Points Prediction Model - MAE: {mae:.2f}")
+        print("\nTraining points prediction model...")
+        points_mae = self._fit_points_model(split)
         
-        return mae
+        return position_mae, points_mae
     
     def predict(self, features_df):
         """Predict position and points for given features"""
         if self.position_model is None or self.points_model is None:
             raise ValueError("Models not trained. Call train_position_model and train_points_model first.")
         
-        feature_cols = [
-            'driver_avg_position', 'driver_position_std', 'driver_best_position',
-            'driver_avg_points', 'driver_wins',
-            'constructor_avg_position', 'constructor_position_std', 'constructor_avg_points',
-            'year_normalized', 'grid_normalized'
-        ]
-        
-        if 'circuit_avg_position' in features_df.columns:
-            feature_cols.append('circuit_avg_position')
-        if 'qualifying_position' in features_df.columns:
-            feature_cols.append('qualifying_position')
+        # Use the columns the models were fitted on, in the same order
+        feature_cols = self.feature_cols_ if self.feature_cols_ is not None else self._select_features(features_df)
+        missing = [col for col in feature_cols if col not in features_df.columns]
+        if missing:
+            raise ValueError(f"Missing feature columns: {missing}")
         
-        available_features = [col for col in feature_cols if col in features_df.columns]
+        X = self._feature_matrix(features_df, feature_cols)
         
-        X = features_df[available_features].fillna(0)
-        X = X.replace([np.inf, -np.inf], 0)
-        
-        predicted_position = self.position_model.predict(X)
-        predicted_points = self.points_model.predict(X)
+        with config_context(assume_finite=True):
+            predicted_position = self.position_model.predict(X)
+            predicted_points = self.points_model.predict(X)
         
         return predicted_position, predicted_points
     
     def save_model(self, filepath):
         """Save trained models"""
+        # Left uncompressed so load_model can memory-map the tree arrays
         joblib.dump({
             'position_model': self.position_model,
-            'points_model': self.points_model
-        }, filepath)
+            'points_model': self.points_model,
+            'feature_cols': self.feature_cols_
+        }, filepath, protocol=5)
     
     def load_model(self, filepath):
         """Load trained models"""
-        models = joblib.load(filepath)
+        models = joblib.load(filepath, mmap_mode='r')
         self.position_model = models['position_model']
         self.points_model = models['points_model']
+        self.feature_cols_ = models.get('feature_cols')  # Absent in older model files
 
 
 if __name__ == "__main__":
@@ -193,20 +273,14 @@ if __name__ == "__main__":
     # Load and prepare data
     data_dir = Path("../data")
     cleaner = F1DataCleaner(data_dir=data_dir)
-    cleaner.load_data()
-    cleaner.clean_all()
-    merged_df = cleaner.merge_data()
+    merged_df, _ = cleaner.clean_all()
     
-    # Prepare features
+    # Prepare features (merged_df already carries qualifying_position)
     model = F1PredictionModel()
-    features_df = model.prepare_features(merged_df, cleaner.qualifying)
+    features_df = model.prepare_features(merged_df, cache_dir=data_dir / "_cache")
     
     # Train models
-    print("Training position prediction model...")
-    model.train_position_model(features_df)
-    
-    print("\nTraining points prediction model...")
-    model.train_points_model(features_df)
+    model.train_all(features_df)
     
     # Save model
     model.save_model(data_dir / "f1_prediction_model.pkl")